@@ -3,7 +3,46 @@ Utility functions for working with Neo4j data types
 """
 from datetime import datetime
 from typing import Any, Optional
-from neo4j.time import DateTime as Neo4jDateTime
+from neo4j.time import DateTime as Neo4jDateTime, Date as Neo4jDate, Time as Neo4jTime
+
+
+def _parse_iso_datetime(value: str) -> Optional[datetime]:
+    """Parse an ISO-8601 string, accepting a trailing 'Z' for UTC"""
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+# Dispatch on the exact type of the value; avoids isinstance/hasattr probes per call
+_DATETIME_CONVERTERS = {
+    datetime: lambda value: value,
+    Neo4jDateTime: Neo4jDateTime.to_native,
+    str: _parse_iso_datetime,
+    type(None): lambda value: None,
+}
+
+# Neo4j temporal types that convert_neo4j_node turns into native Python values
+_NEO4J_TEMPORAL_TYPES = frozenset({Neo4jDateTime, Neo4jDate, Neo4jTime})
+
+# Indexes and constraints the API and the schema extractor rely on; every statement must be idempotent
+CATALOG_INDEXES = [
+    "CREATE FULLTEXT INDEX catalog_name_fts IF NOT EXISTS "
+    "FOR (n:Database|Schema|Table|Column) ON EACH [n.name, n.description]",
+    # Database names are unique; the constraint's backing index replaces the earlier db_name range index
+    "DROP INDEX db_name IF EXISTS",
+    "CREATE CONSTRAINT database_name_unique IF NOT EXISTS FOR (n:Database) REQUIRE n.name IS UNIQUE",
+    # Range indexes turn the {name: ...} lookups at each CONTAINS hop into index seeks
+    "CREATE RANGE INDEX schema_name IF NOT EXISTS FOR (n:Schema) ON (n.name)",
+    "CREATE RANGE INDEX table_name IF NOT EXISTS FOR (n:Table) ON (n.name)",
+    "CREATE RANGE INDEX column_name IF NOT EXISTS FOR (n:Column) ON (n.name)",
+    "CREATE RANGE INDEX dp_name IF NOT EXISTS FOR (n:DataProduct) ON (n.name)",
+    # Composite keys the extractor's delta load matches schemas and tables on, enforced as unique
+    "DROP INDEX schema_key IF EXISTS",
+    "CREATE CONSTRAINT schema_key_unique IF NOT EXISTS FOR (n:Schema) REQUIRE (n.database, n.name) IS UNIQUE",
+    "DROP INDEX table_key IF EXISTS",
+    "CREATE CONSTRAINT table_key_unique IF NOT EXISTS FOR (n:Table) REQUIRE (n.database, n.schema, n.name) IS UNIQUE",
+]
 
 
 def convert_neo4j_datetime(value: Any) -> Optional[datetime]:
@@ -16,25 +55,8 @@ def convert_neo4j_datetime(value: Any) -> Optional[datetime]:
     Returns:
         Python datetime object or None
     """
-    if value is None:
-        return None
-    
-    # If it's already a Python datetime, return it
-    if isinstance(value, datetime):
-        return value
-    
-    # If it's a Neo4j DateTime, convert it
-    if hasattr(value, 'to_native'):
-        return value.to_native()
-    
-    # Try to parse string datetimes
-    if isinstance(value, str):
-        try:
-            return datetime.fromisoformat(value.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            return None
-    
-    return None
+    converter = _DATETIME_CONVERTERS.get(type(value))
+    return converter(value) if converter else None
 
 
 def convert_neo4j_node(node_data: dict) -> dict:
@@ -47,15 +69,10 @@ def convert_neo4j_node(node_data: dict) -> dict:
     Returns:
         Dictionary with converted datetime values
     """
-    converted = {}
-    
-    for key, value in node_data.items():
-        if isinstance(value, Neo4jDateTime) or hasattr(value, 'to_native'):
-            converted[key] = convert_neo4j_datetime(value)
-        else:
-            converted[key] = value
-    
-    return converted
+    return {
+        key: value.to_native() if type(value) in _NEO4J_TEMPORAL_TYPES else value
+        for key, value in node_data.items()
+    }
 
 
 def safe_get_datetime(node: Any, field_name: str) -> Optional[datetime]:
@@ -70,4 +87,17 @@ def safe_get_datetime(node: Any, field_name: str) -> Optional[datetime]:
         Python datetime or None
     """
     value = node.get(field_name)
-    return convert_neo4j_datetime(value)
\ No newline at end of file
+    return convert_neo4j_datetime(value)
+
+
+async def ensure_catalog_indexes(driver) -> None:
+    """
+    Create the catalog indexes if they don't exist yet
+    
+    Args:
+        driver: Neo4j AsyncDriver to run the statements with
+    """
+    async with driver.session() as session:
+        for statement in CATALOG_INDEXES:
+            result = await session.run(statement)
+            await result.consume()
@@ -1,12 +1,13 @@
 import streamlit as st
 import requests
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import networkx as nx
-from datetime import datetime
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+import atexit
+import functools
+import time
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 # Page config
 st.set_page_config(
@@ -19,38 +20,118 @@ st.set_page_config(
 # API Configuration
 API_BASE_URL = st.secrets.get("API_BASE_URL", "http://localhost:8000")
 
+@st.cache_resource
+def get_api_session():
+    """One pooled HTTP session shared by every API call, so connections survive reruns"""
+    session = requests.Session()
+    # Retry's defaults leave POSTs (schema refresh, data product creation) unretried
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20, max_retries=Retry(total=2, backoff_factor=0.2))
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+api_session = get_api_session()
+
+@st.cache_resource
+def get_validated_responses():
+    """Validator headers and body per URL, reused when the API answers 304 Not Modified"""
+    return {}
+
+# Response validator headers and the request headers that send them back
+VALIDATOR_HEADERS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+def conditional_get(url):
+    """GET a JSON body, revalidating the last response for the URL so an unchanged one isn't resent"""
+    validated = get_validated_responses().get(url)
+    headers = {}
+    if validated:
+        headers = {VALIDATOR_HEADERS[name]: value for name, value in validated[0].items()}
+    
+    response = api_session.get(url, headers=headers)
+    if response.status_code == 304:
+        return validated[1]
+    response.raise_for_status()
+    body = response.json()
+    validators = {name: response.headers[name] for name in VALIDATOR_HEADERS if name in response.headers}
+    if validators:
+        get_validated_responses()[url] = (validators, body)
+    return body
+
+# String columns of a search result shown on the Search page
+SEARCH_RESULT_FIELDS = ("name", "type", "path")
+
+# Display labels for search result columns, applied by st.dataframe rather than by renaming the frame
+SEARCH_COLUMN_LABELS = {"name": "Name", "type": "Type", "path": "Path", "metadata": "Metadata"}
+
+# Calls per helper kept for the sidebar's cache stats
+CACHE_STATS_WINDOW = 500
+
+@st.cache_resource
+def get_cache_stats():
+    """Call timings and miss counts per cached helper, shared across sessions"""
+    return defaultdict(lambda: {"timings": deque(maxlen=CACHE_STATS_WINDOW), "misses": 0})
+
+def timed_cache(**cache_kwargs):
+    """st.cache_data that also records each call's time and each miss for the cache stats expander"""
+    def decorator(func):
+        @functools.wraps(func)
+        def on_miss(*args, **kwargs):
+            get_cache_stats()[func.__name__]["misses"] += 1
+            return func(*args, **kwargs)
+        cached = st.cache_data(**cache_kwargs)(on_miss)
+        
+        @functools.wraps(func)
+        def wrapped(*args, **kwargs):
+            start = time.perf_counter()
+            result = cached(*args, **kwargs)
+            get_cache_stats()[func.__name__]["timings"].append(time.perf_counter() - start)
+            return result
+        wrapped.clear = cached.clear
+        return wrapped
+    return decorator
+
 # Helper functions
-@st.cache_data(ttl=300)  # Cache for 5 minutes
-def search_catalog(query, type_filter=None, limit=50):
+@timed_cache(ttl=300)  # Cache for 5 minutes
+def search_catalog(query, type_filter=None, limit=50, offset=0):
     """Search the data catalog"""
-    params = {"q": query, "limit": limit}
+    params = {"q": query, "limit": limit, "offset": offset}
     if type_filter and type_filter != "All":
         params["type_filter"] = type_filter.lower()
     
     try:
-        response = requests.get(f"{API_BASE_URL}/search", params=params)
+        response = api_session.get(f"{API_BASE_URL}/search", params=params)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Search failed: {e}")
         return []
 
-@st.cache_data(ttl=300)
+@timed_cache(ttl=300)
 def get_table_details(database, schema, table):
-    """Get detailed information about a table"""
+    """Get detailed information about a table; revalidated with the API once the cache expires"""
     try:
-        response = requests.get(f"{API_BASE_URL}/table/{database}/{schema}/{table}")
-        response.raise_for_status()
-        return response.json()
+        return conditional_get(f"{API_BASE_URL}/table/{database}/{schema}/{table}")
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to get table details: {e}")
         return None
 
-@st.cache_data(ttl=300)
+@timed_cache(ttl=300, show_spinner=False)  # Reruns reuse the parsed frames instead of rebuilding them
+def get_table_frames(database, schema, table):
+    """Columns, foreign key and referenced-by DataFrames for a table, keyed on the table"""
+    import pandas as pd  # pandas is imported only by the code paths that build DataFrames
+    
+    table_details = get_table_details(database, schema, table) or {}
+    return {
+        key: pd.DataFrame(table_details[key])
+        for key in ("columns", "foreign_keys", "referenced_by")
+        if table_details.get(key)
+    }
+
+@timed_cache(ttl=300)
 def get_table_lineage(database, schema, table, depth=2):
     """Get lineage graph for a table"""
     try:
-        response = requests.get(
+        response = api_session.get(
             f"{API_BASE_URL}/lineage/{database}/{schema}/{table}",
             params={"depth": depth}
         )
@@ -60,60 +141,93 @@ def get_table_lineage(database, schema, table, depth=2):
         st.error(f"Failed to get lineage: {e}")
         return None
 
-@st.cache_data(ttl=60)
+@timed_cache(ttl=300)
 def get_catalog_stats():
     """Get catalog statistics"""
     try:
-        response = requests.get(f"{API_BASE_URL}/stats")
+        response = api_session.get(f"{API_BASE_URL}/stats")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to get stats: {e}")
         return {}
 
-@st.cache_data(ttl=300)
+@timed_cache(ttl=300)
 def get_data_products():
     """Get list of data products"""
     try:
-        response = requests.get(f"{API_BASE_URL}/data-products")
+        response = api_session.get(f"{API_BASE_URL}/data-products")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to get data products: {e}")
         return []
 
-@st.cache_data(ttl=300)
-def get_databases():
-    """Get list of all databases"""
+@timed_cache(ttl=600, show_spinner=False)
+def get_catalog_tree():
+    """Get the full database -> schema -> tables hierarchy, which drives every catalog dropdown"""
     try:
-        response = requests.get(f"{API_BASE_URL}/databases")
-        response.raise_for_status()
-        return response.json()
+        return conditional_get(f"{API_BASE_URL}/catalog-tree")
     except requests.exceptions.RequestException as e:
-        st.error(f"Failed to get databases: {e}")
-        return []
+        st.error(f"Failed to get catalog tree: {e}")
+        return {}
 
-@st.cache_data(ttl=300)
-def get_schemas(database):
-    """Get list of schemas for a database"""
+@timed_cache(ttl=5, show_spinner=False)
+def get_api_health():
+    """HTTP status and health payload of the API, (None, None) if it can't be reached"""
     try:
-        response = requests.get(f"{API_BASE_URL}/databases/{database}/schemas")
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Failed to get schemas: {e}")
-        return []
+        # Short timeouts so an unreachable API can't stall the page
+        response = api_session.get(f"{API_BASE_URL}/health", timeout=(0.2, 1.0))
+        return response.status_code, response.json() if response.status_code == 200 else None
+    except (requests.exceptions.RequestException, ValueError):
+        return None, None
 
-@st.cache_data(ttl=300)
-def get_tables(database, schema):
-    """Get list of tables for a database and schema"""
-    try:
-        response = requests.get(f"{API_BASE_URL}/databases/{database}/schemas/{schema}/tables")
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        st.error(f"Failed to get tables: {e}")
-        return []
+def clear_catalog_cache():
+    """Drop cached catalog structure after a schema refresh; data products stay cached"""
+    for cached_func in (get_catalog_tree, get_table_details, get_table_frames,
+                        get_table_lineage, search_catalog, get_catalog_stats):
+        cached_func.clear()
+
+def clear_data_product_cache():
+    """Drop the cached results a new data product changes"""
+    for cached_func in (get_data_products, get_catalog_stats, get_table_details):
+        cached_func.clear()
+
+def clear_api_cache():
+    """Drop every cached API response; layouts and figures only depend on those responses and stay cached"""
+    clear_catalog_cache()
+    clear_data_product_cache()
+
+@st.cache_resource
+def get_executor():
+    """One thread pool for every parallel or background API call, so reruns don't start new threads"""
+    executor = ThreadPoolExecutor(max_workers=8)
+    atexit.register(executor.shutdown, wait=False)
+    return executor
+
+def prefetch(*calls):
+    """Run independent cached API calls in parallel; returns their results in order
+    
+    Each call is a (function, *args) tuple. Later calls with the same arguments hit the cache.
+    """
+    ctx = get_script_run_ctx()
+    
+    def run(call):
+        add_script_run_ctx(ctx=ctx)  # Lets st.error and the cache work from the worker thread
+        func, *args = call
+        return func(*args)
+    
+    return list(get_executor().map(run, calls))
+
+def prefetch_in_background(func, *args):
+    """Start a cached API call that later reruns will hit; returns its future"""
+    ctx = get_script_run_ctx()
+    
+    def run():
+        add_script_run_ctx(ctx=ctx)
+        return func(*args)
+    
+    return get_executor().submit(run)
 
 def create_data_product(name, description, owner, tags, source_tables):
     """Create a new data product"""
@@ -127,7 +241,7 @@ def create_data_product(name, description, owner, tags, source_tables):
     }
     
     try:
-        response = requests.post(f"{API_BASE_URL}/data-products", json=data)
+        response = api_session.post(f"{API_BASE_URL}/data-products", json=data)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -137,36 +251,154 @@ def create_data_product(name, description, owner, tags, source_tables):
 def refresh_schema():
     """Trigger schema refresh"""
     try:
-        response = requests.post(f"{API_BASE_URL}/refresh-schema")
+        response = api_session.post(f"{API_BASE_URL}/refresh-schema")
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to refresh schema: {e}")
         return None
 
-def create_lineage_graph(lineage_data):
-    """Create interactive lineage graph using Plotly"""
-    if not lineage_data or not lineage_data.get("nodes"):
-        return go.Figure()
+# Above this many nodes the layout uses igraph's DrL, which scales to far larger graphs than spring_layout
+LARGE_LAYOUT_MIN_NODES = 200
+
+def large_graph_layout(node_ids, edges):
+    """Force-directed layout from igraph's DrL (O(n log n))"""
+    import igraph  # Imported on first use, like networkx
     
-    # Create NetworkX graph for layout calculation
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    graph = igraph.Graph(n=len(node_ids), edges=[(index[source], index[target]) for source, target in edges])
+    coords = graph.layout_drl().coords
+    return {node_id: tuple(coords[i]) for i, node_id in enumerate(node_ids)}
+
+@st.cache_data(ttl=3600)
+def compute_layout(node_ids, edges):
+    """Compute node positions for a lineage graph (node_ids and edges as tuples so they hash)"""
+    if len(node_ids) > LARGE_LAYOUT_MIN_NODES:
+        return large_graph_layout(node_ids, edges)
+    
+    import networkx as nx  # Imported on first use so pages without a graph start faster
+    
+    # NetworkX graph for layout calculation
     G = nx.DiGraph()
+    G.add_nodes_from(node_ids)
+    G.add_edges_from(edges)
+    pos = nx.spring_layout(G, k=3, iterations=20, seed=42)  # Fixed seed: the same graph always gets the same layout
+    return {node_id: tuple(xy) for node_id, xy in pos.items()}
+
+# Above this many nodes, the least-connected ones are folded into summary nodes before rendering
+MAX_RENDERED_NODES = 250
+
+def collapse_lineage(lineage_data, max_nodes=MAX_RENDERED_NODES, focus=None):
+    """Fold low-degree nodes into one summary node per remaining neighbour so large graphs stay responsive
+    
+    The focus node and its direct neighbours are never folded away.
+    """
+    nodes, edges = lineage_data["nodes"], lineage_data["edges"]
+    if len(nodes) <= max_nodes:
+        return lineage_data
+    
+    degree = Counter()
+    neighbours = {}
+    for edge in edges:
+        degree[edge["source"]] += 1
+        degree[edge["target"]] += 1
+        neighbours.setdefault(edge["source"], []).append(edge["target"])
+        neighbours.setdefault(edge["target"], []).append(edge["source"])
     
-    # Add nodes
-    for node in lineage_data["nodes"]:
-        G.add_node(node["id"], **node["metadata"])
+    # Keep the focus and its neighbours, then the best-connected nodes up to half the budget;
+    # each summary node stands in for what hangs off one kept node
+    node_ids = {node["id"] for node in nodes}
+    kept_ids = {focus, *neighbours.get(focus, [])} & node_ids if focus else set()
+    ranked = sorted(nodes, key=lambda node: degree[node["id"]], reverse=True)
+    for node in ranked:
+        if len(kept_ids) >= max_nodes // 2:
+            break
+        kept_ids.add(node["id"])
+    group_of = {}
+    group_sizes = Counter()
+    for node in ranked:
+        if node["id"] in kept_ids:
+            continue
+        anchor = next((n for n in neighbours.get(node["id"], []) if n in kept_ids), None)
+        group_id = f"Group_{anchor}" if anchor else "Group_other"
+        group_of[node["id"]] = group_id
+        group_sizes[group_id] += 1
     
-    # Add edges
-    for edge in lineage_data["edges"]:
-        G.add_edge(edge["source"], edge["target"], relationship=edge["relationship"])
+    collapsed_nodes = [node for node in nodes if node["id"] in kept_ids] + [
+        {"id": group_id, "name": f"+{count} tables", "type": "group", "metadata": {"tables": count}}
+        for group_id, count in group_sizes.items()
+    ]
+    collapsed_edges = {}
+    for edge in edges:
+        source = group_of.get(edge["source"], edge["source"])
+        target = group_of.get(edge["target"], edge["target"])
+        if source != target:
+            collapsed_edges.setdefault((source, target), {**edge, "source": source, "target": target})
+    
+    return {"nodes": collapsed_nodes, "edges": list(collapsed_edges.values())}
+
+# Above this many nodes the uncollapsed graph is also rasterised with Datashader
+DATASHADER_MIN_NODES = 5000
+
+@st.cache_data(ttl=600, show_spinner=False)
+def render_lineage_image(lineage_data):
+    """Whole lineage graph drawn as an image, O(pixels) rather than O(nodes)"""
+    import datashader as ds  # Heavy import, only paid for very large graphs
+    import datashader.transfer_functions as tf
+    import pandas as pd
     
-    # Calculate layout
-    pos = nx.spring_layout(G, k=3, iterations=50)
+    edges = tuple((edge["source"], edge["target"]) for edge in lineage_data["edges"])
+    pos = compute_layout(tuple(node["id"] for node in lineage_data["nodes"]), edges)
+    nodes_df = pd.DataFrame(list(pos.values()), columns=["x", "y"])
+    # NaN rows break the line between segments, as with the Plotly edge trace
+    edge_points = []
+    for source, target in edges:
+        edge_points.extend((pos[source], pos[target], (float("nan"), float("nan"))))
+    edges_df = pd.DataFrame(edge_points, columns=["x", "y"])
     
-    # Prepare data for Plotly
-    node_trace = go.Scatter(
-        x=[pos[node["id"]][0] for node in lineage_data["nodes"]],
-        y=[pos[node["id"]][1] for node in lineage_data["nodes"]],
+    canvas = ds.Canvas(
+        plot_width=1200, plot_height=600,
+        x_range=(nodes_df["x"].min(), nodes_df["x"].max()),
+        y_range=(nodes_df["y"].min(), nodes_df["y"].max())
+    )
+    edge_img = tf.shade(canvas.line(edges_df, "x", "y"), cmap=["lightgray", "gray"])
+    node_img = tf.shade(canvas.points(nodes_df, "x", "y"), cmap=["lightblue", "darkblue"])
+    return tf.stack(edge_img, node_img).to_pil()
+
+@st.cache_data(ttl=600, show_spinner=False)
+def index_lineage_edges(lineage_data):
+    """Upstream and downstream neighbours per node from one pass over the lineage edges"""
+    by_target, by_source = defaultdict(list), defaultdict(list)
+    for edge in lineage_data.get("edges", []):
+        by_target[edge["target"]].append(edge["source"])
+        by_source[edge["source"]].append(edge["target"])
+    return dict(by_target), dict(by_source)
+
+@st.cache_data(ttl=600, show_spinner=False)  # The figure only depends on the lineage payload
+def create_lineage_graph(lineage_data, hide_edges=False, focus=None):
+    """Create interactive lineage graph using Plotly, centred on the focus node id if given"""
+    import numpy as np
+    import plotly.graph_objects as go  # Only the Lineage page draws figures
+    
+    if not lineage_data or not lineage_data.get("nodes"):
+        return go.Figure()
+    
+    lineage_data = collapse_lineage(lineage_data, focus=focus)
+    
+    # Calculate layout (cached per graph shape, so reruns reuse the positions)
+    pos = compute_layout(
+        tuple(node["id"] for node in lineage_data["nodes"]),
+        tuple((edge["source"], edge["target"]) for edge in lineage_data["edges"])
+    )
+    
+    # (n, 2) node positions; edges index into it by row
+    node_index = {node["id"]: i for i, node in enumerate(lineage_data["nodes"])}
+    node_xy = np.array([pos[node["id"]] for node in lineage_data["nodes"]], dtype=float)
+    
+    # Prepare data for Plotly; WebGL traces keep pan/zoom smooth on large graphs
+    node_trace = go.Scattergl(
+        x=node_xy[:, 0],
+        y=node_xy[:, 1],
         mode='markers+text',
         text=[node["name"] for node in lineage_data["nodes"]],
         textposition="middle center",
@@ -184,23 +416,23 @@ def create_lineage_graph(lineage_data):
         name="Tables"
     )
     
-    edge_traces = []
-    for edge in lineage_data["edges"]:
-        x0, y0 = pos[edge["source"]]
-        x1, y1 = pos[edge["target"]]
-        
-        edge_trace = go.Scatter(
-            x=[x0, x1, None],
-            y=[y0, y1, None],
-            mode='lines',
-            line=dict(width=2, color="gray"),
-            showlegend=False,
-            hoverinfo='none'
-        )
-        edge_traces.append(edge_trace)
+    # All edges in one trace as source, target, NaN triples; NaN breaks the line between segments
+    sources = np.array([node_index[edge["source"]] for edge in lineage_data["edges"]], dtype=int)
+    targets = np.array([node_index[edge["target"]] for edge in lineage_data["edges"]], dtype=int)
+    gaps = np.full(len(sources), np.nan)
     
-    # Create figure
-    fig = go.Figure(data=[node_trace] + edge_traces)
+    edge_trace = go.Scattergl(
+        x=np.column_stack([node_xy[sources, 0], node_xy[targets, 0], gaps]).ravel(),
+        y=np.column_stack([node_xy[sources, 1], node_xy[targets, 1], gaps]).ravel(),
+        mode='lines',
+        line=dict(width=2, color="gray"),
+        showlegend=False,
+        hoverinfo='none',
+        visible='legendonly' if hide_edges else True
+    )
+    
+    # Create figure (edges first so nodes are drawn on top)
+    fig = go.Figure(data=[edge_trace, node_trace])
     fig.update_layout(
         title="Data Lineage Graph",
         showlegend=False,
@@ -223,6 +455,233 @@ def create_lineage_graph(lineage_data):
     
     return fig
 
+def on_database_change():
+    """Start a new schema and table choice when the database dropdown changes"""
+    st.session_state.selected_database = st.session_state.db_select
+    st.session_state.selected_schema = None
+    st.session_state.selected_table = None
+    for key in ("schema_select", "table_select"):
+        st.session_state.pop(key, None)
+
+def on_schema_change():
+    """Start a new table choice when the schema dropdown changes"""
+    st.session_state.selected_schema = st.session_state.schema_select
+    st.session_state.selected_table = None
+    st.session_state.pop("table_select", None)
+
+def on_table_change():
+    """Remember the newly chosen table"""
+    st.session_state.selected_table = st.session_state.table_select
+
+@st.fragment  # Dropdown changes rerun only this page body, not the sidebar and title
+def render_table_details():
+    """Table Details page: database, schema and table dropdowns and the selected table's details"""
+    
+    # Initialize session state for selections if not exists
+    if 'selected_database' not in st.session_state:
+        st.session_state.selected_database = None
+    if 'selected_schema' not in st.session_state:
+        st.session_state.selected_schema = None
+    if 'selected_table' not in st.session_state:
+        st.session_state.selected_table = None
+    
+    # Fetch the catalog tree together with the remembered table's details
+    # (e.g. when arriving from Search), one round-trip instead of two in a row
+    calls = [(get_catalog_tree,)]
+    if st.session_state.selected_database and st.session_state.selected_schema and st.session_state.selected_table:
+        calls.append((get_table_details, st.session_state.selected_database,
+                      st.session_state.selected_schema, st.session_state.selected_table))
+    catalog_tree = prefetch(*calls)[0]
+    databases = list(catalog_tree)
+    
+    if not databases:
+        st.warning("No databases found. Please refresh the schema from the Admin page.")
+        return
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
+        # Database dropdown
+        database_index = 0
+        if st.session_state.selected_database and st.session_state.selected_database in databases:
+            database_index = databases.index(st.session_state.selected_database)
+        
+        selected_database = st.selectbox(
+            "Database",
+            options=databases,
+            index=database_index,
+            key="db_select",
+            on_change=on_database_change
+        )
+        
+        # No remembered database matched, so the first one is shown; its schemas start fresh
+        if selected_database != st.session_state.selected_database:
+            st.session_state.selected_database = selected_database
+            st.session_state.selected_schema = None
+            st.session_state.selected_table = None
+    
+    with col2:
+        # Schema dropdown
+        schemas = []
+        schema_index = 0
+        
+        if selected_database:
+            database_tree = catalog_tree.get(selected_database, {})
+            schemas = list(database_tree)
+            
+            if schemas:
+                if st.session_state.selected_schema and st.session_state.selected_schema in schemas:
+                    schema_index = schemas.index(st.session_state.selected_schema)
+                
+                selected_schema = st.selectbox(
+                    "Schema",
+                    options=schemas,
+                    index=schema_index,
+                    key="schema_select",
+                    on_change=on_schema_change
+                )
+                
+                # No remembered schema matched, so the first one is shown
+                if selected_schema != st.session_state.selected_schema:
+                    st.session_state.selected_schema = selected_schema
+                    st.session_state.selected_table = None
+            else:
+                st.selectbox("Schema", options=[], disabled=True)
+                selected_schema = None
+        else:
+            st.selectbox("Schema", options=[], disabled=True)
+            selected_schema = None
+    
+    with col3:
+        # Table dropdown
+        tables = []
+        table_index = 0
+        
+        if selected_database and selected_schema:
+            tables = [t["name"] for t in database_tree.get(selected_schema, [])]
+            
+            if tables:
+                if st.session_state.selected_table and st.session_state.selected_table in tables:
+                    table_index = tables.index(st.session_state.selected_table)
+                
+                selected_table = st.selectbox(
+                    "Table",
+                    options=tables,
+                    index=table_index,
+                    key="table_select",
+                    on_change=on_table_change
+                )
+                
+                # Remember the shown table; the first one when none matched
+                st.session_state.selected_table = selected_table
+            else:
+                st.selectbox("Table", options=[], disabled=True)
+                selected_table = None
+        else:
+            st.selectbox("Table", options=[], disabled=True)
+            selected_table = None
+    
+    # Display table details if all selections are made
+    if selected_database and selected_schema and selected_table:
+        with st.spinner("Loading table details..."):
+            table_details = get_table_details(selected_database, selected_schema, selected_table)
+        
+        if table_details:
+            # Table info
+            col1, col2, col3 = st.columns(3)
+            
+            with col1:
+                st.metric("Table Type", table_details["type"].title())
+            with col2:
+                st.metric("Row Count", f"{table_details.get('row_count', 0):,}" if table_details.get('row_count') else "Unknown")
+            with col3:
+                st.metric("Column Count", len(table_details.get("columns", [])))
+            
+            st.markdown("---")
+            
+            table_frames = get_table_frames(selected_database, selected_schema, selected_table)
+            
+            # Columns
+            if "columns" in table_frames:
+                st.subheader("Columns")
+                st.dataframe(table_frames["columns"], width='stretch')
+            
+            # Foreign Keys
+            if "foreign_keys" in table_frames:
+                st.subheader("Foreign Key Relationships")
+                st.dataframe(table_frames["foreign_keys"], width='stretch')
+            
+            # Referenced By
+            if "referenced_by" in table_frames:
+                st.subheader("Referenced By")
+                st.dataframe(table_frames["referenced_by"], width='stretch')
+            
+            # Data Products
+            if table_details.get("data_products"):
+                st.subheader("Related Data Products")
+                for dp in table_details["data_products"]:
+                    st.write(f"• {dp}")
+            
+            # Quick actions
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("View Lineage"):
+                    st.session_state.lineage_database = selected_database
+                    st.session_state.lineage_schema = selected_schema
+                    st.session_state.lineage_table = selected_table
+                    st.session_state.page = "🌐 Data Lineage"
+                    st.rerun()
+            
+            with col2:
+                if st.button("Create Data Product"):
+                    st.session_state.dp_source_tables = [f"{selected_database}.{selected_schema}.{selected_table}"]
+                    st.session_state.page = "📦 Data Products"
+                    st.rerun()
+    else:
+        st.info("Please select a database, schema, and table to view details.")
+
+@st.fragment  # The hide-edges toggle reruns only the graph and summary, not the page and form
+def render_lineage(database, schema, table, depth):
+    """Lineage graph and upstream/downstream summary for one table"""
+    with st.spinner("Loading lineage..."):
+        lineage_data = get_table_lineage(database, schema, table, depth)
+    
+    if lineage_data and lineage_data.get("nodes"):
+        # Create and display graph
+        hide_edges = st.checkbox("Hide edges (smoother pan/zoom on large graphs)")
+        if len(lineage_data["nodes"]) > MAX_RENDERED_NODES:
+            st.caption(f"{len(lineage_data['nodes'])} tables: the least-connected ones are grouped into summary nodes")
+        fig = create_lineage_graph(lineage_data, hide_edges, focus=f"Table_{table}")
+        st.plotly_chart(fig, width='stretch', height=600)
+        
+        if len(lineage_data["nodes"]) > DATASHADER_MIN_NODES:
+            with st.expander("Full graph overview"):
+                st.image(render_lineage_image(lineage_data), width='stretch')
+        
+        # Lineage summary
+        by_target, by_source = index_lineage_edges(lineage_data)
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Upstream Dependencies")
+            upstream = by_target.get(f"Table_{table}", [])
+            if upstream:
+                for dep in upstream:
+                    st.write(f"• {dep.replace('Table_', '')}")
+            else:
+                st.info("No upstream dependencies found")
+        
+        with col2:
+            st.subheader("Downstream Dependencies")
+            downstream = by_source.get(f"Table_{table}", [])
+            if downstream:
+                for dep in downstream:
+                    st.write(f"• {dep.replace('Table_', '')}")
+            else:
+                st.info("No downstream dependencies found")
+    else:
+        st.info("No lineage data found for this table")
+
 # Main application
 def main():
     st.title("🗃️ Data Catalog")
@@ -235,6 +694,28 @@ def main():
         ["🏠 Dashboard", "🔍 Search", "📊 Table Details", "🌐 Data Lineage", "📦 Data Products", "⚙️ Admin"]
     )
     
+    # The catalog tree is cached for 10 minutes and search, details and stats for 5; this forces fresh data on any page
+    if st.sidebar.button("♻️ Invalidate cache"):
+        clear_api_cache()
+        st.rerun()
+    
+    with st.sidebar.expander("Cache stats"):
+        rows = []
+        for name, stats in sorted(get_cache_stats().items()):
+            timings = sorted(stats["timings"])
+            if timings:
+                rows.append({
+                    "Function": name,
+                    "Calls": len(timings),
+                    "Misses": stats["misses"],
+                    "p50 ms": round(timings[len(timings) // 2] * 1000, 1),
+                    "p99 ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))] * 1000, 1),
+                })
+        if rows:
+            st.dataframe(rows, hide_index=True)
+        else:
+            st.caption("No cached calls yet")
+    
     # Dashboard Page
     if page == "🏠 Dashboard":
         st.header("Dashboard")
@@ -268,11 +749,24 @@ def main():
             if quick_search:
                 results = search_catalog(quick_search, limit=10)
                 if results:
-                    for result in results[:5]:
-                        with st.expander(f"{result['name']} ({result['type']})"):
-                            st.write(f"**Path:** {result['path']}")
-                            if result.get('metadata'):
-                                st.json(result['metadata'])
+                    # One table for all results; metadata only for the selected row
+                    import pandas as pd
+                    
+                    results_df = pd.DataFrame(results, columns=list(SEARCH_RESULT_FIELDS))
+                    event = st.dataframe(
+                        results_df,
+                        width='stretch',
+                        hide_index=True,
+                        column_config=SEARCH_COLUMN_LABELS,
+                        on_select="rerun",
+                        selection_mode="single-row",
+                        key="quick_search_results"
+                    )
+                    
+                    if event.selection and event.selection.rows:
+                        selected_result = results[event.selection.rows[0]]
+                        if selected_result.get('metadata'):
+                            st.json(selected_result['metadata'])
         
         with col2:
             st.subheader("Quick Actions")
@@ -280,8 +774,8 @@ def main():
                 with st.spinner("Refreshing schema..."):
                     result = refresh_schema()
                     if result:
-                        st.success("Schema refresh initiated!")
-                        st.cache_data.clear()
+                        # The refresh runs later in the worker, so clearing now would only re-cache the old catalog
+                        st.success("Schema refresh queued! Use ♻️ Invalidate cache in the sidebar once it has finished.")
             
             if st.button("📦 Create Data Product", width='stretch'):
                 st.session_state.page = "📦 Data Products"
@@ -303,30 +797,35 @@ def main():
             )
         
         with col3:
-            limit = st.number_input("Results limit", min_value=10, max_value=100, value=50)
+            page_size = st.number_input("Results per page", min_value=10, max_value=100, value=20)
         
         if search_query:
+            search_page = st.number_input("Page", min_value=1, value=1) - 1
             with st.spinner("Searching..."):
-                results = search_catalog(search_query, type_filter, limit)
+                results = search_catalog(search_query, type_filter, page_size, search_page * page_size)
+            
+            # A full page means there may be more; warm the next one while this page renders
+            if len(results) == page_size:
+                prefetch_in_background(search_catalog, search_query, type_filter, page_size, (search_page + 1) * page_size)
             
             if results:
-                st.success(f"Found {len(results)} results")
+                st.success(f"Showing results {search_page * page_size + 1}-{search_page * page_size + len(results)}")
+                
+                import pandas as pd
+                import pyarrow as pa
                 
-                # Results table
-                df = pd.DataFrame([
-                    {
-                        "Name": r["name"],
-                        "Type": r["type"].title(),
-                        "Path": r["path"],
-                        "Metadata": len(r.get("metadata", {}))
-                    }
-                    for r in results
-                ])
+                # Results table; Arrow builds the string columns without a Python object per cell
+                schema = pa.schema([(field, pa.string()) for field in SEARCH_RESULT_FIELDS])
+                table = pa.Table.from_pylist(results, schema=schema)
+                table = table.append_column("metadata", pa.array([len(r["metadata"]) for r in results]))
+                df = table.to_pandas(types_mapper=pd.ArrowDtype)
+                df["type"] = df["type"].str.title()
                 
                 # Make table clickable
                 event = st.dataframe(
                     df,
                     width='stretch',
+                    column_config=SEARCH_COLUMN_LABELS,
                     on_select="rerun",
                     selection_mode="single-row"
                 )
@@ -350,227 +849,37 @@ def main():
     # Table Details Page
     elif page == "📊 Table Details":
         st.header("Table Details")
-        
-        # Initialize session state for selections if not exists
-        if 'selected_database' not in st.session_state:
-            st.session_state.selected_database = None
-        if 'selected_schema' not in st.session_state:
-            st.session_state.selected_schema = None
-        if 'selected_table' not in st.session_state:
-            st.session_state.selected_table = None
-        
-        # Get list of databases
-        databases = get_databases()
-        
-        if not databases:
-            st.warning("No databases found. Please refresh the schema from the Admin page.")
-            return
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            # Database dropdown
-            database_index = 0
-            if st.session_state.selected_database and st.session_state.selected_database in databases:
-                database_index = databases.index(st.session_state.selected_database)
-            
-            selected_database = st.selectbox(
-                "Database",
-                options=databases,
-                index=database_index,
-                key="db_select"
-            )
-            
-            # Update session state if changed
-            if selected_database != st.session_state.selected_database:
-                st.session_state.selected_database = selected_database
-                st.session_state.selected_schema = None
-                st.session_state.selected_table = None
-                st.rerun()
-        
-        with col2:
-            # Schema dropdown
-            schemas = []
-            schema_index = 0
-            
-            if selected_database:
-                schemas = get_schemas(selected_database)
-                
-                if schemas:
-                    if st.session_state.selected_schema and st.session_state.selected_schema in schemas:
-                        schema_index = schemas.index(st.session_state.selected_schema)
-                    
-                    selected_schema = st.selectbox(
-                        "Schema",
-                        options=schemas,
-                        index=schema_index,
-                        key="schema_select"
-                    )
-                    
-                    # Update session state if changed
-                    if selected_schema != st.session_state.selected_schema:
-                        st.session_state.selected_schema = selected_schema
-                        st.session_state.selected_table = None
-                        st.rerun()
-                else:
-                    st.selectbox("Schema", options=[], disabled=True)
-                    selected_schema = None
-            else:
-                st.selectbox("Schema", options=[], disabled=True)
-                selected_schema = None
-        
-        with col3:
-            # Table dropdown
-            tables = []
-            table_index = 0
-            
-            if selected_database and selected_schema:
-                tables_data = get_tables(selected_database, selected_schema)
-                tables = [t["name"] for t in tables_data]
-                
-                if tables:
-                    if st.session_state.selected_table and st.session_state.selected_table in tables:
-                        table_index = tables.index(st.session_state.selected_table)
-                    
-                    selected_table = st.selectbox(
-                        "Table",
-                        options=tables,
-                        index=table_index,
-                        key="table_select"
-                    )
-                    
-                    # Update session state if changed
-                    if selected_table != st.session_state.selected_table:
-                        st.session_state.selected_table = selected_table
-                        st.rerun()
-                else:
-                    st.selectbox("Table", options=[], disabled=True)
-                    selected_table = None
-            else:
-                st.selectbox("Table", options=[], disabled=True)
-                selected_table = None
-        
-        # Display table details if all selections are made
-        if selected_database and selected_schema and selected_table:
-            with st.spinner("Loading table details..."):
-                table_details = get_table_details(selected_database, selected_schema, selected_table)
-            
-            if table_details:
-                # Table info
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.metric("Table Type", table_details["type"].title())
-                with col2:
-                    st.metric("Row Count", f"{table_details.get('row_count', 0):,}" if table_details.get('row_count') else "Unknown")
-                with col3:
-                    st.metric("Column Count", len(table_details.get("columns", [])))
-                
-                st.markdown("---")
-                
-                # Columns
-                if table_details.get("columns"):
-                    st.subheader("Columns")
-                    columns_df = pd.DataFrame(table_details["columns"])
-                    st.dataframe(columns_df, width='stretch')
-                
-                # Foreign Keys
-                if table_details.get("foreign_keys"):
-                    st.subheader("Foreign Key Relationships")
-                    fk_df = pd.DataFrame(table_details["foreign_keys"])
-                    st.dataframe(fk_df, width='stretch')
-                
-                # Referenced By
-                if table_details.get("referenced_by"):
-                    st.subheader("Referenced By")
-                    ref_df = pd.DataFrame(table_details["referenced_by"])
-                    st.dataframe(ref_df, width='stretch')
-                
-                # Data Products
-                if table_details.get("data_products"):
-                    st.subheader("Related Data Products")
-                    for dp in table_details["data_products"]:
-                        st.write(f"• {dp}")
-                
-                # Quick actions
-                col1, col2 = st.columns(2)
-                with col1:
-                    if st.button("View Lineage"):
-                        st.session_state.lineage_database = selected_database
-                        st.session_state.lineage_schema = selected_schema
-                        st.session_state.lineage_table = selected_table
-                        st.session_state.page = "🌐 Data Lineage"
-                        st.rerun()
-                
-                with col2:
-                    if st.button("Create Data Product"):
-                        st.session_state.dp_source_tables = [f"{selected_database}.{selected_schema}.{selected_table}"]
-                        st.session_state.page = "📦 Data Products"
-                        st.rerun()
-        else:
-            st.info("Please select a database, schema, and table to view details.")    
+        render_table_details()
 
     # Data Lineage Page  
     elif page == "🌐 Data Lineage":
         st.header("Data Lineage")
         
-        col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
-        
-        with col1:
-            database = st.text_input(
-                "Database",
-                value=st.session_state.get("lineage_database", "")
-            )
-        with col2:
-            schema = st.text_input(
-                "Schema", 
-                value=st.session_state.get("lineage_schema", "")
-            )
-        with col3:
-            table = st.text_input(
-                "Table",
-                value=st.session_state.get("lineage_table", "")
-            )
-        with col4:
-            depth = st.selectbox("Depth", [1, 2, 3, 4, 5], index=1)
+        # One form so editing the four fields reruns (and fetches lineage) once, on submit
+        with st.form("lineage_form"):
+            col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+            
+            with col1:
+                database = st.text_input(
+                    "Database",
+                    value=st.session_state.get("lineage_database", "")
+                )
+            with col2:
+                schema = st.text_input(
+                    "Schema", 
+                    value=st.session_state.get("lineage_schema", "")
+                )
+            with col3:
+                table = st.text_input(
+                    "Table",
+                    value=st.session_state.get("lineage_table", "")
+                )
+            with col4:
+                depth = st.selectbox("Depth", [1, 2, 3, 4, 5], index=1)
+            st.form_submit_button("Show Lineage")
         
         if database and schema and table:
-            with st.spinner("Loading lineage..."):
-                lineage_data = get_table_lineage(database, schema, table, depth)
-            
-            if lineage_data and lineage_data.get("nodes"):
-                # Create and display graph
-                fig = create_lineage_graph(lineage_data)
-                st.plotly_chart(fig, width='stretch', height=600)
-                
-                # Lineage summary
-                col1, col2 = st.columns(2)
-                
-                with col1:
-                    st.subheader("Upstream Dependencies")
-                    upstream = [
-                        edge["source"] for edge in lineage_data.get("edges", [])
-                        if edge["target"] == f"Table_{table}"
-                    ]
-                    if upstream:
-                        for dep in upstream:
-                            st.write(f"• {dep.replace('Table_', '')}")
-                    else:
-                        st.info("No upstream dependencies found")
-                
-                with col2:
-                    st.subheader("Downstream Dependencies")
-                    downstream = [
-                        edge["target"] for edge in lineage_data.get("edges", [])
-                        if edge["source"] == f"Table_{table}"
-                    ]
-                    if downstream:
-                        for dep in downstream:
-                            st.write(f"• {dep.replace('Table_', '')}")
-                    else:
-                        st.info("No downstream dependencies found")
-            else:
-                st.info("No lineage data found for this table")
+            render_lineage(database, schema, table, depth)
     
     # Data Products Page
     elif page == "📦 Data Products":
@@ -622,7 +931,7 @@ def main():
                     result = create_data_product(name, description, owner, tags, tables)
                     if result:
                         st.success(f"Data product '{name}' created successfully!")
-                        st.cache_data.clear()
+                        clear_data_product_cache()
                         st.rerun()
     
     # Admin Page
@@ -638,8 +947,8 @@ def main():
                 with st.spinner("Refreshing schema..."):
                     result = refresh_schema()
                     if result:
-                        st.success("Schema refresh initiated!")
-                        st.cache_data.clear()
+                        # The refresh runs later in the worker, so clearing now would only re-cache the old catalog
+                        st.success("Schema refresh queued! Use ♻️ Invalidate cache in the sidebar once it has finished.")
             
             st.info("Schema is automatically refreshed daily at 2:00 AM")
         
@@ -647,21 +956,25 @@ def main():
             st.subheader("Cache Management")
             
             if st.button("🗑️ Clear Cache"):
-                st.cache_data.clear()
+                clear_api_cache()
                 st.success("Cache cleared!")
         
         # System status
         st.subheader("System Status")
         
-        try:
-            response = requests.get(f"{API_BASE_URL}/health")
-            if response.status_code == 200:
-                st.success("✅ API is healthy")
-                health_data = response.json()
+        status_code, health_data = get_api_health()
+        if status_code == 200:
+            st.success("✅ API is healthy")
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("Status", str(health_data.get("status", "-")).title())
+            with col2:
+                st.metric("Checked At", health_data.get("timestamp", "-"))
+            with st.expander("Full health payload"):
                 st.json(health_data)
-            else:
-                st.error("❌ API is not responding correctly")
-        except:
+        elif status_code is not None:
+            st.error("❌ API is not responding correctly")
+        else:
             st.error("❌ Cannot connect to API")
 
 if __name__ == "__main__":
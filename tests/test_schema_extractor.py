@@ -0,0 +1,107 @@
+import re
+
+from schema_extractor import DeltaStrategy, SchemaExtractor
+
+
+def make_extractor(database_filter=None, schema_filter=None, table_filter=None):
+    """An extractor with only the state delta planning needs, without engines or drivers"""
+    extractor = SchemaExtractor.__new__(SchemaExtractor)
+    extractor.delta_strategy = DeltaStrategy.INCREMENTAL
+    extractor.database_filter = re.compile(database_filter) if database_filter else None
+    extractor.schema_filter = re.compile(schema_filter) if schema_filter else None
+    extractor.table_filter = re.compile(table_filter) if table_filter else None
+    return extractor
+
+
+def make_table(name):
+    return {'name': name, 'type': 'table', 'columns': [], 'foreign_keys': [], 'content_hash': 'hash'}
+
+
+def make_rows(db_name, tables_by_schema):
+    schema_data = {'databases': [{
+        'name': db_name,
+        'extraction_time': '2024-01-01T00:00:00',
+        'schemas': [
+            {'name': schema_name, 'tables': [make_table(name) for name in table_names], 'views': []}
+            for schema_name, table_names in tables_by_schema.items()
+        ]
+    }]}
+    return SchemaExtractor._flatten_schema(schema_data)
+
+
+EXISTING = {
+    'databases': ['sales_db', 'hr_db'],
+    'database_hashes': {},
+    'schemas': [('sales_db', 'dbo'), ('sales_db', 'archive'), ('hr_db', 'dbo')],
+    'tables': {
+        ('sales_db', 'dbo', 'orders'): 'hash',
+        ('sales_db', 'dbo', 'orders_old'): 'hash',
+        ('sales_db', 'dbo', 'customers'): 'hash',
+        ('sales_db', 'archive', 'orders_2019'): 'hash',
+        ('hr_db', 'dbo', 'employees'): 'hash',
+    }
+}
+
+
+def test_unfiltered_run_removes_everything_not_extracted():
+    delta = make_extractor()._plan_delta(make_rows('sales_db', {'dbo': ['orders', 'customers']}), EXISTING, set())
+    
+    assert {row['name'] for row in delta['removed_tables']} == {'orders_old', 'orders_2019', 'employees'}
+    assert delta['removed_schemas'] == [{'database': 'sales_db', 'name': 'archive'}, {'database': 'hr_db', 'name': 'dbo'}]
+    assert delta['removed_databases'] == ['hr_db']
+
+
+def test_filtered_run_leaves_out_of_scope_nodes_untouched():
+    extractor = make_extractor(database_filter='^sales_', schema_filter='^dbo$', table_filter='^orders')
+    delta = extractor._plan_delta(make_rows('sales_db', {'dbo': ['orders']}), EXISTING, set())
+    
+    # Only the in-scope table that wasn't extracted goes; customers, archive and hr_db stay
+    assert delta['removed_tables'] == [{'database': 'sales_db', 'schema': 'dbo', 'name': 'orders_old'}]
+    assert delta['removed_schemas'] == []
+    assert delta['removed_databases'] == []
+
+
+def test_schema_filter_keeps_other_schemas_and_databases():
+    extractor = make_extractor(schema_filter='^dbo$')
+    delta = extractor._plan_delta(make_rows('sales_db', {'dbo': ['orders', 'customers']}), EXISTING, set())
+    
+    assert {row['name'] for row in delta['removed_tables']} == {'orders_old', 'employees'}
+    assert delta['removed_schemas'] == [{'database': 'hr_db', 'name': 'dbo'}]
+    assert delta['removed_databases'] == []
+
+
+def test_failed_database_is_left_untouched():
+    delta = make_extractor()._plan_delta(make_rows('sales_db', {'dbo': ['orders']}), EXISTING, {'hr_db'})
+    
+    assert all(row['database'] == 'sales_db' for row in delta['removed_tables'])
+    assert delta['removed_databases'] == []
+
+
+def test_only_unlisted_databases_count_as_vanished():
+    schema_data = {
+        'databases': [{'name': 'sales_db'}],
+        'failed_databases': ['finance_db'],
+        'listed_databases': ['sales_db', 'finance_db', 'hr_db']
+    }
+    existing_databases = ['sales_db', 'finance_db', 'hr_db', 'dropped_db']
+    
+    protected = SchemaExtractor._protected_databases(schema_data, existing_databases)
+    
+    assert protected == {'finance_db', 'hr_db'}
+
+
+def test_nothing_vanishes_without_a_database_listing():
+    schema_data = {'databases': [{'name': 'sales_db'}], 'failed_databases': [], 'listed_databases': None}
+    
+    protected = SchemaExtractor._protected_databases(schema_data, ['sales_db', 'hr_db'])
+    
+    assert protected == {'hr_db'}
+
+
+def test_type_strings_are_cached_by_value():
+    from sqlalchemy.dialects.mssql import NVARCHAR
+    
+    first, second = NVARCHAR(50), NVARCHAR(50)
+    
+    assert SchemaExtractor._type_str(first) == SchemaExtractor._type_str(second) == str(first)
+    assert SchemaExtractor._type_str(NVARCHAR(100)) == str(NVARCHAR(100))